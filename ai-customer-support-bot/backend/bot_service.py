@@ -1,15 +1,84 @@
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import case, func, insert, update
 from sqlalchemy.orm import Session
 from models import Session as ChatSession, Conversation, FAQ, EscalationLog
-from llm_service import LLMService
+from llm_service import llm_service
 from datetime import datetime, timedelta
+import os
+import threading
+import time
 import uuid
+import orjson
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Shared Redis client for the recent-history cache (disabled when REDIS_URL is unset)
+history_cache = redis.Redis.from_url(REDIS_URL) if redis and REDIS_URL else None
+
+# Idle sessions drop out of Redis after this many seconds
+HISTORY_CACHE_TTL = int(os.getenv("HISTORY_CACHE_TTL", "3600"))
+
+history_cache_stats = {"hits": 0, "misses": 0}
+
+FAQ_CACHE_TTL = float(os.getenv("FAQ_CACHE_TTL", "60"))
+
+# Active FAQs shared by every request in this process, reloaded after FAQ_CACHE_TTL seconds
+_faq_cache = {"faqs": None, "expires_at": 0.0}
+
+def invalidate_faq_cache():
+    """Drop the cached FAQ list so the next message reloads it from the database"""
+    _faq_cache["faqs"] = None
+    _faq_cache["expires_at"] = 0.0
+
+SESSION_TOUCH_INTERVAL = float(os.getenv("SESSION_TOUCH_INTERVAL", "2"))
+
+# Latest activity time per session, written back in bulk by flush_session_touches
+_pending_session_touches: Dict[str, datetime] = {}
+_session_touches_lock = threading.Lock()
+
+def touch_session(session_id: str):
+    """Record session activity without writing the session row on this request"""
+    with _session_touches_lock:
+        _pending_session_touches[session_id] = datetime.utcnow()
+
+def flush_session_touches(db: Session) -> int:
+    """Write all pending session updated_at values with a single UPDATE"""
+    with _session_touches_lock:
+        touches = dict(_pending_session_touches)
+        _pending_session_touches.clear()
+    
+    if not touches:
+        return 0
+    
+    try:
+        db.execute(
+            update(ChatSession)
+            .where(ChatSession.id.in_(touches))
+            .values(updated_at=case(touches, value=ChatSession.id))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        # Put the touches back unless a newer one has arrived meanwhile
+        with _session_touches_lock:
+            for session_id, touched_at in touches.items():
+                _pending_session_touches.setdefault(session_id, touched_at)
+        raise
+    
+    return len(touches)
 
 class BotService:
     def __init__(self, db: Session):
         self.db = db
-        self.llm_service = LLMService()
+        self.llm_service = llm_service
         self.max_conversation_history = 20  # Keep last 20 messages in memory
+        self.history_cache = history_cache
     
     def start_session(self, customer_email: Optional[str] = None, customer_name: Optional[str] = None) -> str:
         """Start a new chat session"""
@@ -30,12 +99,9 @@ class BotService:
         """Process user message and generate bot response"""
         
         # Get or create session
-        session = self.get_session(session_id)
-        if not session:
-            return {"error": "Session not found", "session_id": session_id}
-        
-        if not session.is_active:
-            return {"error": "Session is no longer active", "session_id": session_id}
+        session, error = self._get_active_session(session_id)
+        if error:
+            return error
         
         # Get conversation history for context
         conversation_history = self._get_conversation_history(session_id)
@@ -48,44 +114,195 @@ class BotService:
             bot_response, should_escalate, matched_faq_id = self.llm_service.generate_response(
                 user_message=user_message,
                 conversation_history=conversation_history,
-                faqs=faqs
+                faqs=faqs,
+                session_id=session_id
             )
             
-            # Save conversation
-            conversation = Conversation(
-                session_id=session_id,
-                user_message=user_message,
-                bot_response=bot_response,
-                escalated=should_escalate,
-                faq_matched=matched_faq_id
-            )
-            self.db.add(conversation)
+            return self._save_exchange(session, user_message, bot_response, should_escalate, matched_faq_id)
             
-            # Handle escalation if needed
-            if should_escalate:
-                self._escalate_session(session_id, "LLM determined escalation needed")
-                session.escalated = True
+        except Exception as e:
+            return self._handle_message_error(session_id, e)
+    
+    def process_messages(self, session_id: str, user_messages: List[str]) -> List[Dict]:
+        """
+        Process several user messages for one session in a batch
+        History and FAQs are loaded once, and all exchanges are inserted and
+        committed together; returns one process_message-style dict per message
+        """
+        
+        session, error = self._get_active_session(session_id)
+        if error:
+            return [error for _ in user_messages]
+        
+        # Copy, since the batch's own exchanges are appended as context for later messages
+        conversation_history = list(self._get_conversation_history(session_id))
+        faqs = self._get_active_faqs()
+        
+        try:
+            exchanges = []
+            for user_message in user_messages:
+                bot_response, should_escalate, matched_faq_id = self.llm_service.generate_response(
+                    user_message=user_message,
+                    conversation_history=conversation_history[-self.max_conversation_history:],
+                    faqs=faqs,
+                    session_id=session_id
+                )
+                exchanges.append({
+                    "session_id": session_id,
+                    "user_message": user_message,
+                    "bot_response": bot_response,
+                    "escalated": should_escalate,
+                    "faq_matched": matched_faq_id
+                })
+                conversation_history.append({"user_message": user_message, "bot_response": bot_response})
+            
+            # One multi-row INSERT for the whole batch
+            saved = self.db.execute(
+                insert(Conversation).returning(Conversation.timestamp, sort_by_parameter_order=True),
+                exchanges
+            ).all()
             
-            # Update session timestamp
-            session.updated_at = datetime.utcnow()
+            # Escalation logs for the batch go in as a single executemany
+            escalation_logs = [
+                {"session_id": session_id, "reason": "LLM determined escalation needed"}
+                for exchange in exchanges if exchange["escalated"]
+            ]
+            if escalation_logs:
+                self.db.execute(insert(EscalationLog), escalation_logs)
+                session.escalated = True
             
             self.db.commit()
             
-            return {
-                "bot_response": bot_response,
+        except Exception as e:
+            error = self._handle_message_error(session_id, e)
+            return [error for _ in user_messages]
+        
+        touch_session(session_id)
+        
+        for exchange in exchanges:
+            self._cache_conversation(session_id, exchange["user_message"], exchange["bot_response"])
+        
+        return [
+            {
+                "bot_response": exchange["bot_response"],
                 "session_id": session_id,
-                "escalated": should_escalate,
-                "matched_faq": matched_faq_id,
-                "timestamp": conversation.timestamp.isoformat()
+                "escalated": exchange["escalated"],
+                "matched_faq": exchange["faq_matched"],
+                "timestamp": row.timestamp  # serialized by the API response model
             }
+            for exchange, row in zip(exchanges, saved)
+        ]
+    
+    async def process_message_async(self, session_id: str, user_message: str) -> Dict:
+        """Process user message without blocking the event loop while the LLM responds"""
+        
+        session, error = self._get_active_session(session_id)
+        if error:
+            return error
+        
+        conversation_history = self._get_conversation_history(session_id)
+        faqs = self._get_active_faqs()
+        
+        try:
+            bot_response, should_escalate, matched_faq_id = await self.llm_service.generate_response_async(
+                user_message=user_message,
+                conversation_history=conversation_history,
+                faqs=faqs,
+                session_id=session_id
+            )
+            
+            return self._save_exchange(session, user_message, bot_response, should_escalate, matched_faq_id)
             
         except Exception as e:
-            self.db.rollback()
-            print(f"Error processing message: {e}")
-            return {
-                "error": "Failed to process message",
-                "session_id": session_id
-            }
+            return self._handle_message_error(session_id, e)
+    
+    async def stream_message(self, session_id: str, user_message: str) -> AsyncIterator[Dict]:
+        """
+        Process user message, streaming the bot response as it is generated
+        Yields {"delta": text} events, then the same dict process_message returns
+        once the full response has been saved
+        """
+        
+        session, error = self._get_active_session(session_id)
+        if error:
+            yield error
+            return
+        
+        conversation_history = self._get_conversation_history(session_id)
+        faqs = self._get_active_faqs()
+        
+        chunks = []
+        async for chunk in self.llm_service.stream_response(
+            user_message=user_message,
+            conversation_history=conversation_history,
+            faqs=faqs,
+            session_id=session_id
+        ):
+            chunks.append(chunk)
+            yield {"delta": chunk}
+        
+        bot_response = "".join(chunks)
+        
+        try:
+            should_escalate, matched_faq_id = self.llm_service.analyze_response(user_message, bot_response, faqs)
+            yield self._save_exchange(session, user_message, bot_response, should_escalate, matched_faq_id)
+        except Exception as e:
+            yield self._handle_message_error(session_id, e)
+    
+    def _get_active_session(self, session_id: str) -> Tuple[Optional[ChatSession], Optional[Dict]]:
+        """Get an active session, or the error response to return instead"""
+        session = self.get_session(session_id)
+        if not session:
+            return None, {"error": "Session not found", "session_id": session_id}
+        
+        if not session.is_active:
+            return None, {"error": "Session is no longer active", "session_id": session_id}
+        
+        return session, None
+    
+    def _save_exchange(self, session: ChatSession, user_message: str, bot_response: str, should_escalate: bool, matched_faq_id: Optional[str]) -> Dict:
+        """Save a message exchange and build the chat response"""
+        session_id = session.id
+        
+        # Save conversation with a plain INSERT, skipping the ORM unit of work
+        conversation = self.db.execute(
+            insert(Conversation).values(
+                session_id=session_id,
+                user_message=user_message,
+                bot_response=bot_response,
+                escalated=should_escalate,
+                faq_matched=matched_faq_id
+            ).returning(Conversation.id, Conversation.timestamp)
+        ).one()
+        
+        # Handle escalation if needed
+        if should_escalate:
+            self._escalate_session(session_id, "LLM determined escalation needed")
+            session.escalated = True
+        
+        self.db.commit()
+        
+        # Session timestamp is written back in the background
+        touch_session(session_id)
+        
+        self._cache_conversation(session_id, user_message, bot_response)
+        
+        return {
+            "bot_response": bot_response,
+            "session_id": session_id,
+            "escalated": should_escalate,
+            "matched_faq": matched_faq_id,
+            "timestamp": conversation.timestamp  # serialized by the API response model
+        }
+    
+    def _handle_message_error(self, session_id: str, error: Exception) -> Dict:
+        """Roll back a failed message and build the error response"""
+        self.db.rollback()
+        print(f"Error processing message: {error}")
+        return {
+            "error": "Failed to process message",
+            "session_id": session_id
+        }
     
     def get_conversation_history(self, session_id: str) -> List[Dict]:
         """Get formatted conversation history for a session"""
@@ -106,28 +323,89 @@ class BotService:
     
     def _get_conversation_history(self, session_id: str) -> List[Dict]:
         """Get conversation history for LLM context"""
-        conversations = self.db.query(Conversation).filter(
+        if self.history_cache is not None:
+            try:
+                cached = self.history_cache.lrange(self._history_key(session_id), 0, self.max_conversation_history - 1)
+                if cached:
+                    history_cache_stats["hits"] += 1
+                    # Cached newest-first, return in chronological order
+                    return [orjson.loads(item) for item in reversed(cached)]
+            except redis.RedisError as e:
+                print(f"History cache error: {e}")
+        
+            history_cache_stats["misses"] += 1
+        
+        history = self._load_conversation_history(session_id)
+        
+        if self.history_cache is not None and history:
+            try:
+                key = self._history_key(session_id)
+                pipe = self.history_cache.pipeline()
+                pipe.delete(key)
+                pipe.lpush(key, *[orjson.dumps(conv) for conv in history])
+                pipe.expire(key, HISTORY_CACHE_TTL)
+                pipe.execute()
+            except redis.RedisError as e:
+                print(f"History cache error: {e}")
+        
+        return history
+    
+    def _load_conversation_history(self, session_id: str) -> List[Dict]:
+        """Load conversation history for LLM context from the database"""
+        # Only the two message columns are needed, so skip loading full ORM objects
+        conversations = self.db.query(
+            Conversation.user_message,
+            Conversation.bot_response
+        ).filter(
             Conversation.session_id == session_id
         ).order_by(Conversation.timestamp.desc()).limit(self.max_conversation_history).all()
         
-        # Reverse to get chronological order
-        conversations = list(reversed(conversations))
-        
+        # Walk the newest-first rows backwards to get chronological order without copying
         return [
             {
                 "user_message": conv.user_message,
                 "bot_response": conv.bot_response
             }
-            for conv in conversations
+            for conv in reversed(conversations)
         ]
     
+    def _history_key(self, session_id: str) -> str:
+        return f"hist:{session_id}"
+    
+    def _cache_conversation(self, session_id: str, user_message: str, bot_response: str):
+        """Append an exchange to the cached history, if the session is already cached"""
+        if self.history_cache is None:
+            return
+        
+        key = self._history_key(session_id)
+        entry = orjson.dumps({"user_message": user_message, "bot_response": bot_response})
+        try:
+            # LPUSHX only appends to an existing list so a partial history is never cached
+            pipe = self.history_cache.pipeline()
+            pipe.lpushx(key, entry)
+            pipe.ltrim(key, 0, self.max_conversation_history - 1)
+            pipe.expire(key, HISTORY_CACHE_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"History cache error: {e}")
+    
     def _get_active_faqs(self) -> List[Dict]:
         """Get active FAQs for LLM knowledge"""
-        faqs = self.db.query(FAQ).filter(
+        cached = _faq_cache["faqs"]
+        now = time.monotonic()
+        if cached is not None and now < _faq_cache["expires_at"]:
+            return cached
+        
+        faqs = self.db.query(
+            FAQ.id,
+            FAQ.question,
+            FAQ.answer,
+            FAQ.category
+        ).filter(
             FAQ.is_active == True
         ).order_by(FAQ.priority).all()
         
-        return [
+        faqs = [
             {
                 "id": faq.id,
                 "question": faq.question,
@@ -136,14 +414,26 @@ class BotService:
             }
             for faq in faqs
         ]
+        
+        # Keep the previous list object when nothing changed so prompt caches stay warm
+        if faqs != cached:
+            _faq_cache["faqs"] = faqs
+        _faq_cache["expires_at"] = now + FAQ_CACHE_TTL
+        
+        return _faq_cache["faqs"]
+    
+    def prefetch_faqs(self) -> int:
+        """Load active FAQs into the shared cache before the first message needs them"""
+        return len(self._get_active_faqs())
     
     def _escalate_session(self, session_id: str, reason: str):
         """Create escalation log for session"""
-        escalation = EscalationLog(
-            session_id=session_id,
-            reason=reason
+        self.db.execute(
+            insert(EscalationLog).values(
+                session_id=session_id,
+                reason=reason
+            )
         )
-        self.db.add(escalation)
     
     def escalate_manually(self, session_id: str, reason: str) -> bool:
         """Manually escalate a session"""
@@ -171,8 +461,17 @@ class BotService:
         session.is_active = False
         session.updated_at = datetime.utcnow()
         
+        # This write supersedes any pending background touch
+        with _session_touches_lock:
+            _pending_session_touches.pop(session_id, None)
+        
         try:
             self.db.commit()
+            if self.history_cache is not None:
+                try:
+                    self.history_cache.delete(self._history_key(session_id))
+                except redis.RedisError as e:
+                    print(f"History cache error: {e}")
             return True
         except Exception as e:
             self.db.rollback()
@@ -191,13 +490,11 @@ class BotService:
         """Clean up old inactive sessions"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
-        old_sessions = self.db.query(ChatSession).filter(
+        # delete() returns the number of rows removed, so no separate COUNT query is needed
+        count = self.db.query(ChatSession).filter(
             ChatSession.updated_at < cutoff_time,
             ChatSession.is_active == False
-        )
-        
-        count = old_sessions.count()
-        old_sessions.delete()
+        ).delete(synchronize_session=False)
         self.db.commit()
         
         print(f"Cleaned up {count} old sessions")
@@ -211,25 +508,42 @@ class BotService:
     
     def get_escalated_sessions(self) -> List[Dict]:
         """Get all escalated sessions with details"""
-        escalated_sessions = self.db.query(ChatSession).filter(
+        # Rank escalation logs per session so the latest one can be joined in the same query
+        latest_escalation = self.db.query(
+            EscalationLog.session_id,
+            EscalationLog.reason,
+            EscalationLog.timestamp,
+            EscalationLog.resolved,
+            func.row_number().over(
+                partition_by=EscalationLog.session_id,
+                order_by=EscalationLog.timestamp.desc()
+            ).label("rank")
+        ).subquery()
+        
+        rows = self.db.query(
+            ChatSession.id,
+            ChatSession.customer_email,
+            ChatSession.customer_name,
+            ChatSession.created_at,
+            latest_escalation.c.reason,
+            latest_escalation.c.timestamp,
+            latest_escalation.c.resolved
+        ).outerjoin(
+            latest_escalation,
+            (latest_escalation.c.session_id == ChatSession.id) & (latest_escalation.c.rank == 1)
+        ).filter(
             ChatSession.escalated == True
         ).all()
         
-        result = []
-        for session in escalated_sessions:
-            # Get latest escalation log
-            escalation = self.db.query(EscalationLog).filter(
-                EscalationLog.session_id == session.id
-            ).order_by(EscalationLog.timestamp.desc()).first()
-            
-            result.append({
-                "session_id": session.id,
-                "customer_email": session.customer_email,
-                "customer_name": session.customer_name,
-                "created_at": session.created_at.isoformat(),
-                "escalation_reason": escalation.reason if escalation else "Unknown",
-                "escalation_time": escalation.timestamp.isoformat() if escalation else None,
-                "resolved": escalation.resolved if escalation else False
-            })
-        
-        return result
\ No newline at end of file
+        return [
+            {
+                "session_id": row.id,
+                "customer_email": row.customer_email,
+                "customer_name": row.customer_name,
+                "created_at": row.created_at.isoformat(),
+                "escalation_reason": row.reason if row.reason is not None else "Unknown",
+                "escalation_time": row.timestamp.isoformat() if row.timestamp is not None else None,
+                "resolved": bool(row.resolved) if row.resolved is not None else False
+            }
+            for row in rows
+        ]
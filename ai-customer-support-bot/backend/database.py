@@ -1,5 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 from models import Base
 import os
 from dotenv import load_dotenv
@@ -8,8 +9,48 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/customer_support.db")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+
+# WAL lets readers run alongside a writer, but it permanently switches the database
+# file's journal mode and adds -wal/-shm files next to it, so it is opt-in
+SQLITE_WAL = os.getenv("SQLITE_WAL", "false").lower() == "true"
+
+# Applied to every new SQLite connection; temp tables stay in memory, and under WAL
+# NORMAL skips the per-commit fsync that WAL makes unnecessary
+SQLITE_PRAGMAS = ["PRAGMA temp_store=MEMORY"]
+if SQLITE_WAL:
+    SQLITE_PRAGMAS += ["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"]
+
+# In-memory SQLite only exists on a single connection, so it gets a StaticPool;
+# everything else gets a QueuePool sized for FastAPI's worker threadpool
+if "sqlite" in DATABASE_URL and ":memory:" in DATABASE_URL:
+    engine_options = {"poolclass": StaticPool}
+else:
+    engine_options = {
+        "poolclass": QueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+
 # Create engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
+    **engine_options
+)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -17,6 +58,11 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips tables that already exist, so add any indexes they are missing
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     """Dependency to get database session"""
@@ -29,4 +75,5 @@ def get_db():
 def init_db():
     """Initialize database with tables"""
     create_tables()
-    print("Database initialized successfully!")
\ No newline at end of file
+    print("Database initialized successfully!")
+    print(f"Connection pool: {engine.pool.status()}")
\ No newline at end of file
@@ -1,11 +1,102 @@
 import google.generativeai as genai
+import asyncio
 import os
-import json
-from typing import List, Dict, Optional, Tuple
+import re
+import sys
+import math
+import orjson
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
 load_dotenv()
 
+ESCALATION_INDICATORS = [
+    "[ESCALATE]",
+    "speak with a human",
+    "transfer to agent",
+    "human representative",
+]
+
+ESCALATION_KEYWORDS = [
+    "angry", "frustrated", "terrible", "awful", "horrible",
+    "manager", "supervisor", "human", "agent", "representative",
+    "refund", "cancel", "billing", "charge", "payment",
+    "security", "hacked", "breach", "unauthorized"
+]
+
+FALLBACK_RESPONSE = "I apologize, but I'm having technical difficulties. Please try again later or speak with a human agent."
+
+# Number of per-session Gemini chats kept warm in this process
+CHAT_SESSION_CACHE_SIZE = int(os.getenv("CHAT_SESSION_CACHE_SIZE", "1000"))
+
+# Conversation turns kept as context for the model
+CONTEXT_TURNS = 10
+
+# Responses to identical stateless prompts are reused for RESPONSE_CACHE_TTL seconds;
+# RESPONSE_CACHE_SIZE=0 turns the cache off
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+# Directory for an on-disk response cache shared across runs (needs diskcache)
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR")
+
+# One alternation per list so each message is scanned once instead of once per keyword,
+# keeping per-turn escalation checks in C without a compiled extension of our own
+_ESCALATION_INDICATOR_RE = re.compile("|".join(map(re.escape, ESCALATION_INDICATORS)), re.IGNORECASE)
+_ESCALATION_KEYWORD_RE = re.compile("|".join(map(re.escape, ESCALATION_KEYWORDS)), re.IGNORECASE)
+
+# Minimum TF-IDF cosine similarity for a message to count as an FAQ match
+FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", "0.75"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Filler words that would otherwise link unrelated questions ("how do I ...", "what are your ...")
+_STOP_WORDS = frozenset("""
+about all and any are but can could did does for from get got had has have how into its
+not our ours that the these this those was were what when where which who why will with
+would you your yours
+""".split())
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms used for FAQ matching"""
+    return [word for word in _TOKEN_RE.findall(text.lower()) if len(word) > 2 and word not in _STOP_WORDS]
+
+# Static parts of the system prompt; only the FAQ section between them changes
+_PROMPT_HEAD = """You are a helpful customer support assistant. Your goal is to provide accurate, friendly, and efficient support to customers.
+
+Guidelines:
+1. Always be polite and professional
+2. Try to resolve customer issues using the provided FAQ knowledge
+3. If you cannot answer a question confidently, suggest escalation to a human agent
+4. Keep responses concise but complete
+5. Ask clarifying questions when needed
+6. Show empathy for customer concerns
+
+"""
+
+_PROMPT_TAIL = """
+
+If you encounter any of these situations, indicate that the conversation should be escalated:
+- Customer is angry or frustrated beyond what you can handle
+- Technical issues that require specialized knowledge
+- Billing disputes or refund requests
+- Account security concerns
+- Complex troubleshooting that hasn't been resolved after 3 attempts
+- Customer specifically requests to speak with a human
+
+Always end your response with [ESCALATE] if escalation is needed, otherwise end with [CONTINUE].
+"""
+
 class LLMService:
     def __init__(self):
         genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
@@ -13,137 +104,405 @@ class LLMService:
         self.model = genai.GenerativeModel(self.model_name)
         self.max_tokens = int(os.getenv("MAX_TOKENS", "1000"))
         self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
+        self._faq_index_faqs = None
+        self._faq_index_key = None
+        self._faq_index = None
+        self._chat_sessions = OrderedDict()  # session_id -> (system_prompt, ChatSession, [(user, bot) turns in the chat])
+        self._chat_locks = {}  # session_id -> [threading.Lock serializing sends on that chat, requests using it]
+        self._chat_async_locks = {}  # session_id -> [asyncio.Lock, requests using it], the same for the async paths
+        self._chat_locks_guard = threading.Lock()
+        self.chat_cache_hits = 0
+        self.chat_cache_misses = 0
+        self._system_prompt_faqs = None
+        self._system_prompt = None
+        self._response_cache = OrderedDict()  # prompt key -> (expires_at, response text)
+        self._disk_cache = diskcache.Cache(RESPONSE_CACHE_DIR) if diskcache and RESPONSE_CACHE_DIR and RESPONSE_CACHE_SIZE > 0 else None
     
-    def generate_response(self, user_message: str, conversation_history: List[Dict], faqs: List[Dict]) -> Tuple[str, bool, Optional[str]]:
+    def generate_response(self, user_message: str, conversation_history: List[Dict], faqs: List[Dict], session_id: Optional[str] = None) -> Tuple[str, bool, Optional[str]]:
         """
         Generate bot response using LLM
         Returns: (response_text, should_escalate, matched_faq_id)
+        
+        With a session_id the Gemini chat for that session is reused, so only
+        the new user turn is sent instead of the whole prompt and history.
         """
         
         # Create system prompt
-        system_prompt = self._build_system_prompt(faqs)
+        system_prompt = self._get_system_prompt(faqs)
         
         try:
-            # Build conversation context for Gemini
-            full_prompt = system_prompt + "\n\nConversation History:\n"
+            if session_id is not None:
+                with self._chat_lock(session_id):
+                    chat = self._get_chat_session(session_id, system_prompt, conversation_history)
+                    response = chat.send_message(user_message, generation_config=self._generation_config())
+                    bot_response = response.text
+                    self._record_chat_turn(session_id, chat, user_message, bot_response)
+            else:
+                prompt = self._build_full_prompt(system_prompt, conversation_history, user_message)
+                cache_key = self._response_cache_key(prompt)
+                bot_response = self._get_cached_response(cache_key)
+                if bot_response is None:
+                    response = self.model.generate_content(prompt, generation_config=self._generation_config())
+                    bot_response = response.text
+                    self._cache_response(cache_key, bot_response)
             
-            # Add conversation history
-            for conv in conversation_history[-10:]:  # Last 10 messages for context
-                full_prompt += f"User: {conv['user_message']}\nBot: {conv['bot_response']}\n"
+            should_escalate, matched_faq_id = self.analyze_response(user_message, bot_response, faqs)
             
-            # Add current user message
-            full_prompt += f"\nUser: {user_message}\nBot:"
-            
-            # Configure generation parameters
-            generation_config = genai.types.GenerationConfig(
-                max_output_tokens=self.max_tokens,
-                temperature=self.temperature,
-            )
-            
-            response = self.model.generate_content(
-                full_prompt,
-                generation_config=generation_config
-            )
-            
-            bot_response = response.text
+            return bot_response, should_escalate, matched_faq_id
             
-            # Check if escalation is needed
-            should_escalate = self._should_escalate(user_message, bot_response)
+        except Exception as e:
+            return self._handle_error(e, session_id)
+    
+    async def generate_response_async(self, user_message: str, conversation_history: List[Dict], faqs: List[Dict], session_id: Optional[str] = None) -> Tuple[str, bool, Optional[str]]:
+        """Async version of generate_response that does not block the event loop on the Gemini call"""
+        
+        system_prompt = self._get_system_prompt(faqs)
+        
+        try:
+            if session_id is not None:
+                async with self._chat_async_lock(session_id):
+                    chat = self._get_chat_session(session_id, system_prompt, conversation_history)
+                    response = await chat.send_message_async(user_message, generation_config=self._generation_config())
+                    bot_response = response.text
+                    self._record_chat_turn(session_id, chat, user_message, bot_response)
+            else:
+                prompt = self._build_full_prompt(system_prompt, conversation_history, user_message)
+                cache_key = self._response_cache_key(prompt)
+                bot_response = self._get_cached_response(cache_key)
+                if bot_response is None:
+                    response = await self.model.generate_content_async(prompt, generation_config=self._generation_config())
+                    bot_response = response.text
+                    self._cache_response(cache_key, bot_response)
             
-            # Try to match FAQ
-            matched_faq_id = self._match_faq(user_message, faqs)
+            should_escalate, matched_faq_id = self.analyze_response(user_message, bot_response, faqs)
             
             return bot_response, should_escalate, matched_faq_id
             
         except Exception as e:
-            print(f"LLM Error: {e}")
-            return "I apologize, but I'm having technical difficulties. Please try again later or speak with a human agent.", True, None
+            return self._handle_error(e, session_id)
+    
+    async def stream_response(self, user_message: str, conversation_history: List[Dict], faqs: List[Dict], session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield the bot response text chunk by chunk as Gemini produces it
+        Callers run analyze_response on the assembled text once the stream ends
+        """
+        
+        system_prompt = self._get_system_prompt(faqs)
+        
+        try:
+            if session_id is not None:
+                async with self._chat_async_lock(session_id):
+                    chat = self._get_chat_session(session_id, system_prompt, conversation_history)
+                    response = await chat.send_message_async(user_message, generation_config=self._generation_config(), stream=True)
+                    
+                    chunks = []
+                    async for chunk in response:
+                        chunks.append(chunk.text)
+                        yield chunk.text
+                    
+                    self._record_chat_turn(session_id, chat, user_message, "".join(chunks))
+            else:
+                response = await self.model.generate_content_async(
+                    self._build_full_prompt(system_prompt, conversation_history, user_message),
+                    generation_config=self._generation_config(),
+                    stream=True
+                )
+                
+                async for chunk in response:
+                    yield chunk.text
+                
+        except Exception as e:
+            yield self._handle_error(e, session_id)[0]
+    
+    def analyze_response(self, user_message: str, bot_response: str, faqs: List[Dict]) -> Tuple[bool, Optional[str]]:
+        """
+        Check a generated response for escalation and FAQ matches
+        Returns: (should_escalate, matched_faq_id)
+        """
+        
+        # Check if escalation is needed
+        should_escalate = self._should_escalate(user_message, bot_response)
+        
+        # Try to match FAQ
+        matched_faq_id = self._match_faq(user_message, faqs)
+        
+        return should_escalate, matched_faq_id
+    
+    def _generation_config(self):
+        """Configure generation parameters"""
+        return genai.types.GenerationConfig(
+            max_output_tokens=self.max_tokens,
+            temperature=self.temperature,
+        )
+    
+    def _build_full_prompt(self, system_prompt: str, conversation_history: List[Dict], user_message: str) -> str:
+        """Build a single prompt with the system prompt, recent history and the new message"""
+        
+        # Build conversation context for Gemini
+        full_prompt = system_prompt + "\n\nConversation History:\n"
+        
+        # Add conversation history
+        for conv in conversation_history[-CONTEXT_TURNS:]:  # Last 10 messages for context
+            full_prompt += f"User: {conv['user_message']}\nBot: {conv['bot_response']}\n"
+        
+        # Add current user message
+        full_prompt += f"\nUser: {user_message}\nBot:"
+        
+        return full_prompt
+    
+    def _response_cache_key(self, prompt: str) -> str:
+        """Hash everything that shapes a stateless response: model, generation settings and prompt"""
+        payload = orjson.dumps({
+            "model": self.model_name,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "prompt": prompt
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        """Get a cached response for a prompt key, checking memory before disk"""
+        if RESPONSE_CACHE_SIZE <= 0:
+            return None
+        
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._response_cache.move_to_end(key)
+                return cached[1]
+            del self._response_cache[key]
+        
+        if self._disk_cache is not None:
+            text = self._disk_cache.get(key)
+            if text is not None:
+                self._remember_response(key, text)
+                return text
+        
+        return None
+    
+    def _cache_response(self, key: str, text: str):
+        """Store a response in the memory cache and, if configured, on disk"""
+        if RESPONSE_CACHE_SIZE <= 0:
+            return
+        
+        self._remember_response(key, text)
+        if self._disk_cache is not None:
+            self._disk_cache.set(key, text, expire=RESPONSE_CACHE_TTL)
+    
+    def _remember_response(self, key: str, text: str):
+        """Put a response in the in-memory LRU, evicting the oldest entries past RESPONSE_CACHE_SIZE"""
+        self._response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL, text)
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
+    def _handle_error(self, error: Exception, session_id: Optional[str]) -> Tuple[str, bool, Optional[str]]:
+        """Log an LLM failure and return the fallback response"""
+        print(f"LLM Error: {error}")
+        if session_id is not None:
+            # Start from a clean chat on the next turn
+            self._chat_sessions.pop(session_id, None)
+            self._drop_idle_chat_locks(session_id)
+        return FALLBACK_RESPONSE, True, None
+    
+    def _get_chat_session(self, session_id: str, system_prompt: str, conversation_history: List[Dict]):
+        """
+        Get the cached Gemini chat for a session, seeding a new one from history on a miss
+        A cached chat is only reused while its turns match the end of the stored
+        history; turns handled by another worker or a failed save force a rebuild
+        """
+        
+        recent = [(conv['user_message'], conv['bot_response']) for conv in conversation_history[-CONTEXT_TURNS:]]
+        
+        cached = self._chat_sessions.get(session_id)
+        if cached is not None and cached[0] == system_prompt and cached[2] == recent:
+            self.chat_cache_hits += 1
+            self._chat_sessions.move_to_end(session_id)
+            return cached[1]
+        
+        self.chat_cache_misses += 1
+        
+        # System prompt goes in as the opening exchange, followed by the stored turns
+        history = [
+            {"role": "user", "parts": [system_prompt]},
+            {"role": "model", "parts": ["Understood. [CONTINUE]"]},
+        ]
+        for user_message, bot_response in recent:
+            history.append({"role": "user", "parts": [user_message]})
+            history.append({"role": "model", "parts": [bot_response]})
+        
+        chat = self.model.start_chat(history=history)
+        self._chat_sessions[session_id] = (system_prompt, chat, recent)
+        self._chat_sessions.move_to_end(session_id)
+        
+        while len(self._chat_sessions) > CHAT_SESSION_CACHE_SIZE:
+            evicted, _ = self._chat_sessions.popitem(last=False)
+            self._drop_idle_chat_locks(evicted)
+        
+        return chat
+    
+    @contextmanager
+    def _chat_lock(self, session_id: str):
+        """Hold the session's lock so only one thread sends on its chat at a time"""
+        entry = self._checkout_chat_lock(self._chat_locks, session_id, threading.Lock)
+        try:
+            with entry[0]:
+                yield
+        finally:
+            self._release_chat_lock(self._chat_locks, session_id, entry)
+    
+    @asynccontextmanager
+    async def _chat_async_lock(self, session_id: str):
+        """Hold the session's asyncio lock so only one task sends on its chat at a time"""
+        entry = self._checkout_chat_lock(self._chat_async_locks, session_id, asyncio.Lock)
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            self._release_chat_lock(self._chat_async_locks, session_id, entry)
+    
+    def _checkout_chat_lock(self, locks: Dict, session_id: str, lock_type) -> List:
+        """Get a session's lock entry, creating it only when missing, and count the caller as a user"""
+        with self._chat_locks_guard:
+            entry = locks.get(session_id)
+            if entry is None:
+                entry = locks[session_id] = [lock_type(), 0]
+            entry[1] += 1
+            return entry
+    
+    def _release_chat_lock(self, locks: Dict, session_id: str, entry: List):
+        """Stop counting the caller; the last user drops the lock once its chat is gone"""
+        with self._chat_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0 and session_id not in self._chat_sessions:
+                del locks[session_id]
+    
+    def _drop_idle_chat_locks(self, session_id: str):
+        """Forget a session's locks unless a request holds or waits on them"""
+        with self._chat_locks_guard:
+            for locks in (self._chat_locks, self._chat_async_locks):
+                entry = locks.get(session_id)
+                if entry is not None and entry[1] == 0:
+                    del locks[session_id]
+    
+    def _record_chat_turn(self, session_id: str, chat, user_message: str, bot_response: str):
+        """Note a completed exchange on the session's cached chat and trim its history"""
+        
+        self._trim_chat_history(chat)
+        cached = self._chat_sessions.get(session_id)
+        if cached is not None and cached[1] is chat:
+            turns = cached[2]
+            turns.append((user_message, bot_response))
+            del turns[:-CONTEXT_TURNS]
+    
+    def chat_cache_stats(self) -> Dict:
+        """Get size and hit/miss counters of the per-session chat cache"""
+        return {
+            "size": len(self._chat_sessions),
+            "max_size": CHAT_SESSION_CACHE_SIZE,
+            "hits": self.chat_cache_hits,
+            "misses": self.chat_cache_misses
+        }
+    
+    def _trim_chat_history(self, chat):
+        """Keep the system prompt plus the last CONTEXT_TURNS exchanges in a cached chat"""
+        
+        max_length = 2 + 2 * CONTEXT_TURNS
+        if len(chat.history) > max_length:
+            chat.history = chat.history[:2] + chat.history[-2 * CONTEXT_TURNS:]
+    
+    def _get_system_prompt(self, faqs: List[Dict]) -> str:
+        """Get the system prompt, only rebuilding it when a different FAQ list is passed in"""
+        
+        if faqs is not self._system_prompt_faqs:
+            self._system_prompt = self._build_system_prompt(faqs)
+            self._system_prompt_faqs = faqs
+        return self._system_prompt
     
     def _build_system_prompt(self, faqs: List[Dict]) -> str:
         """Build system prompt with FAQ knowledge"""
         
         faq_knowledge = ""
         if faqs:
-            faq_knowledge = "\\n\\nFrequently Asked Questions:\\n"
-            for faq in faqs:
-                faq_knowledge += f"Q: {faq['question']}\\nA: {faq['answer']}\\n\\n"
+            faq_knowledge = "\\n\\nFrequently Asked Questions:\\n" + "".join(
+                f"Q: {faq['question']}\\nA: {faq['answer']}\\n\\n" for faq in faqs
+            )
         
-        system_prompt = f"""You are a helpful customer support assistant. Your goal is to provide accurate, friendly, and efficient support to customers.
-
-Guidelines:
-1. Always be polite and professional
-2. Try to resolve customer issues using the provided FAQ knowledge
-3. If you cannot answer a question confidently, suggest escalation to a human agent
-4. Keep responses concise but complete
-5. Ask clarifying questions when needed
-6. Show empathy for customer concerns
-
-{faq_knowledge}
-
-If you encounter any of these situations, indicate that the conversation should be escalated:
-- Customer is angry or frustrated beyond what you can handle
-- Technical issues that require specialized knowledge
-- Billing disputes or refund requests
-- Account security concerns
-- Complex troubleshooting that hasn't been resolved after 3 attempts
-- Customer specifically requests to speak with a human
-
-Always end your response with [ESCALATE] if escalation is needed, otherwise end with [CONTINUE].
-"""
-        return system_prompt
+        return _PROMPT_HEAD + faq_knowledge + _PROMPT_TAIL
     
     def _should_escalate(self, user_message: str, bot_response: str) -> bool:
         """Determine if the conversation should be escalated"""
         
-        escalation_indicators = [
-            "[ESCALATE]",
-            "speak with a human",
-            "transfer to agent",
-            "human representative",
-        ]
-        
         # Check bot response for escalation indicators
-        response_lower = bot_response.lower()
-        for indicator in escalation_indicators:
-            if indicator.lower() in response_lower:
-                return True
+        if _ESCALATION_INDICATOR_RE.search(bot_response):
+            return True
         
         # Check user message for escalation keywords
-        user_lower = user_message.lower()
-        escalation_keywords = [
-            "angry", "frustrated", "terrible", "awful", "horrible",
-            "manager", "supervisor", "human", "agent", "representative",
-            "refund", "cancel", "billing", "charge", "payment",
-            "security", "hacked", "breach", "unauthorized"
-        ]
-        
-        for keyword in escalation_keywords:
-            if keyword in user_lower:
-                return True
+        if _ESCALATION_KEYWORD_RE.search(user_message):
+            return True
         
         return False
     
     def _match_faq(self, user_message: str, faqs: List[Dict]) -> Optional[str]:
-        """Try to match user message with FAQ using simple keyword matching"""
+        """Match user message to the most similar FAQ question by TF-IDF cosine similarity"""
         
-        user_lower = user_message.lower()
+        idf, postings, faq_ids = self._get_faq_index(faqs)
         
-        for faq in faqs:
-            # Check question similarity
-            question_words = faq['question'].lower().split()
-            
-            # Simple keyword matching
-            matches = 0
-            for word in question_words:
-                if len(word) > 3 and word in user_lower:
-                    matches += 1
-            
-            # If enough keywords match, consider it a match
-            if matches >= 2 or matches / len(question_words) > 0.3:
-                return faq['id']
+        query = {term: count * idf[term] for term, count in Counter(_tokenize(user_message)).items() if term in idf}
+        if not query:
+            return None
+        
+        norm = math.sqrt(sum(weight * weight for weight in query.values()))
+        
+        # Only FAQs sharing a term with the message are scored
+        scores = defaultdict(float)
+        for term, weight in query.items():
+            for index, faq_weight in postings[term]:
+                scores[index] += weight / norm * faq_weight
+        
+        # Ties go to the higher-priority (earlier) FAQ
+        best = max(scores, key=lambda index: (scores[index], -index))
+        if scores[best] >= FAQ_MATCH_THRESHOLD:
+            return faq_ids[best]
         
         return None
     
+    def _get_faq_index(self, faqs: List[Dict]):
+        """Get the TF-IDF index for this FAQ set, rebuilding it when the FAQs change"""
+        
+        # The cached FAQ list is passed in unchanged on most turns, so check identity first
+        if faqs is self._faq_index_faqs:
+            return self._faq_index
+        
+        key = tuple((faq['id'], faq['question']) for faq in faqs)
+        if key != self._faq_index_key:
+            self._faq_index = self._build_faq_index(faqs)
+            self._faq_index_key = key
+        self._faq_index_faqs = faqs
+        return self._faq_index
+    
+    def _build_faq_index(self, faqs: List[Dict]):
+        """
+        Build an inverted TF-IDF index over FAQ questions
+        Returns: (idf by term, term -> [(faq index, normalized weight)], faq ids)
+        """
+        
+        # Terms are lowercased and interned once here rather than on every message
+        term_counts = [Counter(map(sys.intern, _tokenize(faq['question']))) for faq in faqs]
+        doc_freq = Counter(term for counts in term_counts for term in counts)
+        
+        # Smoothed IDF, as in scikit-learn's TfidfVectorizer
+        idf = {term: math.log((1 + len(faqs)) / (1 + freq)) + 1 for term, freq in doc_freq.items()}
+        
+        postings = {}
+        for index, counts in enumerate(term_counts):
+            weights = {term: count * idf[term] for term, count in counts.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            for term, weight in weights.items():
+                postings.setdefault(term, []).append((index, weight / norm))
+        
+        return idf, postings, [faq['id'] for faq in faqs]
+    
     def summarize_conversation(self, conversations: List[Dict]) -> str:
         """Summarize a conversation for reporting or escalation"""
         
@@ -180,4 +539,7 @@ Keep the summary concise but comprehensive."""
             
         except Exception as e:
             print(f"Summarization Error: {e}")
-            return f"Summary generation failed. Conversation had {len(conversations)} exchanges."
\ No newline at end of file
+            return f"Summary generation failed. Conversation had {len(conversations)} exchanges."
+
+# Shared instance so the Gemini client is configured once per process
+llm_service = LLMService()
@@ -1,17 +1,20 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
+from datetime import datetime
 from sqlalchemy.orm import Session
+import asyncio
 import os
+import orjson
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Import our modules
-from database import get_db, init_db
-from bot_service import BotService
+from database import get_db, init_db, SessionLocal
+from bot_service import BotService, invalidate_faq_cache, flush_session_touches, history_cache_stats, SESSION_TOUCH_INTERVAL
 from models import FAQ
 
 load_dotenv()
@@ -35,8 +38,11 @@ app.add_middleware(
 BASE_DIR = Path(__file__).resolve().parent
 FRONTEND_DIR = (BASE_DIR.parent / "frontend").resolve()
 
-# Serve static files (frontend)
-if FRONTEND_DIR.exists():
+API_DEBUG = os.getenv("API_DEBUG", "True").lower() == "true"
+
+# Serve static files (frontend) in development; in production the reverse proxy
+# serves /static straight from disk so assets never reach the ASGI workers
+if API_DEBUG and FRONTEND_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR)), name="static")
 
 # Request/Response models
@@ -67,26 +73,117 @@ class FAQResponse(BaseModel):
     priority: int
     is_active: bool
 
+# Declared response models document and validate the JSON each endpoint returns;
+# recent FastAPI releases also serialize them with pydantic instead of jsonable_encoder
+class HealthResponse(BaseModel):
+    status: str
+    service: str
+
+class StartSessionResponse(BaseModel):
+    session_id: str
+    message: str
+
+class ChatResponse(BaseModel):
+    bot_response: str
+    session_id: str
+    escalated: bool
+    matched_faq: Optional[str] = None
+    timestamp: datetime
+
+class ConversationEntry(BaseModel):
+    user_message: str
+    bot_response: str
+    timestamp: str
+    escalated: bool
+    faq_matched: Optional[str] = None
+
+class HistoryResponse(BaseModel):
+    history: List[ConversationEntry]
+
+class MessageResponse(BaseModel):
+    message: str
+
+class SummaryResponse(BaseModel):
+    summary: str
+
+class CategoriesResponse(BaseModel):
+    categories: List[str]
+
+class StatsResponse(BaseModel):
+    active_sessions: int
+    escalated_sessions: int
+    cache: Dict[str, Dict[str, int]]
+
+class EscalatedSession(BaseModel):
+    session_id: str
+    customer_email: Optional[str] = None
+    customer_name: Optional[str] = None
+    created_at: str
+    escalation_reason: str
+    escalation_time: Optional[str] = None
+    resolved: bool
+
+class EscalatedSessionsResponse(BaseModel):
+    escalated_sessions: List[EscalatedSession]
+
+def write_session_touches():
+    """Flush pending session timestamps to the database"""
+    db = SessionLocal()
+    try:
+        flush_session_touches(db)
+    except Exception as e:
+        print(f"Error updating session timestamps: {e}")
+    finally:
+        db.close()
+
+def warm_faq_cache():
+    """Load the active FAQs once up front so the first chat doesn't pay for the query"""
+    db = SessionLocal()
+    try:
+        count = BotService(db).prefetch_faqs()
+        print(f"Loaded {count} active FAQs")
+    except Exception as e:
+        print(f"Error loading FAQs: {e}")
+    finally:
+        db.close()
+
+async def session_touch_writer():
+    """Periodically write back session activity recorded by the chat endpoints"""
+    while True:
+        await asyncio.sleep(SESSION_TOUCH_INTERVAL)
+        # The UPDATE and commit run in a worker thread so requests aren't held up
+        await asyncio.to_thread(write_session_touches)
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    warm_faq_cache()
+    app.state.session_touch_writer = asyncio.create_task(session_touch_writer())
     print("AI Customer Support Bot started successfully!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.session_touch_writer.cancel()
+    await asyncio.to_thread(write_session_touches)
+
+def get_bot_service(db: Session = Depends(get_db)) -> BotService:
+    """Dependency to get a bot service bound to the request's database session"""
+    return BotService(db)
+
 # Health check endpoint
-@app.get("/health")
+@app.api_route("/health", methods=["GET", "HEAD"], response_model=HealthResponse)
 async def health_check():
     return {"status": "healthy", "service": "AI Customer Support Bot"}
 
 # Session management endpoints
-@app.post("/api/sessions/start")
+@app.post("/api/sessions/start", response_model=StartSessionResponse)
 async def start_session(
     request: StartSessionRequest,
-    db: Session = Depends(get_db)
+    bot_service: BotService = Depends(get_bot_service)
 ):
     """Start a new chat session"""
     try:
-        bot_service = BotService(db)
         session_id = bot_service.start_session(
             customer_email=request.customer_email,
             customer_name=request.customer_name
@@ -101,15 +198,14 @@ async def start_session(
             detail=f"Failed to start session: {str(e)}"
         )
 
-@app.post("/api/chat")
+@app.post("/api/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    bot_service: BotService = Depends(get_bot_service)
 ):
     """Send a message and get bot response"""
     try:
-        bot_service = BotService(db)
-        response = bot_service.process_message(
+        response = await bot_service.process_message_async(
             session_id=request.session_id,
             user_message=request.message
         )
@@ -129,14 +225,43 @@ async def chat(
             detail=f"Failed to process message: {str(e)}"
         )
 
-@app.get("/api/sessions/{session_id}/history")
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    bot_service: BotService = Depends(get_bot_service)
+):
+    """Send a message and stream the bot response as newline-delimited JSON"""
+    events = bot_service.stream_message(
+        session_id=request.session_id,
+        user_message=request.message
+    )
+    
+    # Check the first event so session errors still get a proper status code
+    first_event = await events.__anext__()
+    if "error" in first_event:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=first_event["error"]
+        )
+    
+    async def event_stream():
+        try:
+            yield orjson.dumps(first_event) + b"\n"
+            async for event in events:
+                yield orjson.dumps(event) + b"\n"
+        finally:
+            # get_db may be torn down before the stream ends, so close the session here
+            bot_service.db.close()
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.get("/api/sessions/{session_id}/history", response_model=HistoryResponse)
 async def get_conversation_history(
     session_id: str,
-    db: Session = Depends(get_db)
+    bot_service: BotService = Depends(get_bot_service)
 ):
     """Get conversation history for a session"""
     try:
-        bot_service = BotService(db)
         history = bot_service.get_conversation_history(session_id)
         return {"history": history}
     except Exception as e:
@@ -145,15 +270,14 @@ async def get_conversation_history(
             detail=f"Failed to get conversation history: {str(e)}"
         )
 
-@app.post("/api/sessions/{session_id}/escalate")
+@app.post("/api/sessions/{session_id}/escalate", response_model=MessageResponse)
 async def escalate_session(
     session_id: str,
     request: EscalateRequest,
-    db: Session = Depends(get_db)
+    bot_service: BotService = Depends(get_bot_service)
 ):
     """Manually escalate a session"""
     try:
-        bot_service = BotService(db)
         success = bot_service.escalate_manually(session_id, request.reason)
         
         if not success:
@@ -171,14 +295,13 @@ async def escalate_session(
             detail=f"Failed to escalate session: {str(e)}"
         )
 
-@app.post("/api/sessions/{session_id}/end")
+@app.post("/api/sessions/{session_id}/end", response_model=MessageResponse)
 async def end_session(
     session_id: str,
-    db: Session = Depends(get_db)
+    bot_service: BotService = Depends(get_bot_service)
 ):
     """End a chat session"""
     try:
-        bot_service = BotService(db)
         success = bot_service.end_session(session_id)
         
         if not success:
@@ -196,14 +319,13 @@ async def end_session(
             detail=f"Failed to end session: {str(e)}"
         )
 
-@app.get("/api/sessions/{session_id}/summary")
+@app.get("/api/sessions/{session_id}/summary", response_model=SummaryResponse)
 async def get_session_summary(
     session_id: str,
-    db: Session = Depends(get_db)
+    bot_service: BotService = Depends(get_bot_service)
 ):
     """Get AI-generated summary of a session"""
     try:
-        bot_service = BotService(db)
         summary = bot_service.get_session_summary(session_id)
         
         if summary is None:
@@ -271,6 +393,7 @@ async def create_faq(
         db.add(faq)
         db.commit()
         db.refresh(faq)
+        invalidate_faq_cache()
         
         return FAQResponse(
             id=faq.id,
@@ -286,7 +409,7 @@ async def create_faq(
             detail=f"Failed to create FAQ: {str(e)}"
         )
 
-@app.get("/api/faqs/categories")
+@app.get("/api/faqs/categories", response_model=CategoriesResponse)
 async def get_faq_categories(db: Session = Depends(get_db)):
     """Get all FAQ categories"""
     try:
@@ -302,18 +425,20 @@ async def get_faq_categories(db: Session = Depends(get_db)):
         )
 
 # Admin endpoints
-@app.get("/api/admin/stats")
-async def get_admin_stats(db: Session = Depends(get_db)):
+@app.get("/api/admin/stats", response_model=StatsResponse)
+async def get_admin_stats(bot_service: BotService = Depends(get_bot_service)):
     """Get admin statistics"""
     try:
-        bot_service = BotService(db)
-        
         active_sessions = bot_service.get_active_sessions_count()
         escalated_sessions = len(bot_service.get_escalated_sessions())
         
         return {
             "active_sessions": active_sessions,
-            "escalated_sessions": escalated_sessions
+            "escalated_sessions": escalated_sessions,
+            "cache": {
+                "chat_sessions": bot_service.llm_service.chat_cache_stats(),
+                "history": history_cache_stats
+            }
         }
     except Exception as e:
         raise HTTPException(
@@ -321,11 +446,10 @@ async def get_admin_stats(db: Session = Depends(get_db)):
             detail=f"Failed to get admin stats: {str(e)}"
         )
 
-@app.get("/api/admin/escalated")
-async def get_escalated_sessions(db: Session = Depends(get_db)):
+@app.get("/api/admin/escalated", response_model=EscalatedSessionsResponse)
+async def get_escalated_sessions(bot_service: BotService = Depends(get_bot_service)):
     """Get all escalated sessions"""
     try:
-        bot_service = BotService(db)
         escalated = bot_service.get_escalated_sessions()
         return {"escalated_sessions": escalated}
     except Exception as e:
@@ -358,11 +482,10 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("API_PORT", "8000"))
     host = os.getenv("API_HOST", "localhost")
-    debug = os.getenv("API_DEBUG", "True").lower() == "true"
     
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
-        reload=debug
+        reload=API_DEBUG
     )
\ No newline at end of file
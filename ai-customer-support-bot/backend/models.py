@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -34,6 +34,10 @@ class Conversation(Base):
     
     # Relationship with session
     session = relationship("Session", back_populates="conversations")
+    
+    __table_args__ = (
+        Index("ix_conv_sess_ts", "session_id", "timestamp"),
+    )
 
 class FAQ(Base):
     __tablename__ = "faqs"
@@ -47,6 +51,10 @@ class FAQ(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    
+    __table_args__ = (
+        Index("ix_faq_active_priority", "is_active", "priority"),
+    )
 
 class EscalationLog(Base):
     __tablename__ = "escalation_logs"
@@ -56,4 +64,8 @@ class EscalationLog(Base):
     reason = Column(Text, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
     resolved = Column(Boolean, default=False)
-    resolution_notes = Column(Text, nullable=True)
\ No newline at end of file
+    resolution_notes = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_esc_sess_ts", "session_id", "timestamp"),
+    )
\ No newline at end of file
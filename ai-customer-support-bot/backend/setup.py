@@ -7,76 +7,134 @@ This script will:
 3. Verify the setup
 """
 
+import io
 import json
 import os
+import shutil
 import sys
+from contextlib import contextmanager, redirect_stdout
+from itertools import islice
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Add the backend directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database import init_db, get_db
+from sqlalchemy import func, select, text
+from database import init_db, SessionLocal
 from models import FAQ
 from dotenv import load_dotenv
 
+# Project root (the directory holding data/ and .env)
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Sample FAQ files smaller than this are parsed in one go; larger ones are streamed
+FAQ_STREAM_THRESHOLD = 10 * 1024 * 1024  # 10 MB
+
+# FAQs inserted per batch while streaming the JSON file
+FAQ_BATCH_SIZE = 5000
+
+# Extra SQLite settings for the bulk load: a 64 MB page cache (WAL, synchronous=NORMAL
+# and in-memory temp data are already set on every connection by database.py)
+SQLITE_BULK_LOAD_PRAGMAS = [
+    "PRAGMA cache_size=-65536",
+]
+
+@contextmanager
+def buffered_output():
+    """Collect everything a setup step prints and write it to stdout in one go"""
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            yield
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
+def iter_faq_records(f):
+    """Iterate FAQ records from a JSON array file opened in binary mode"""
+    # Small files: a single orjson parse beats incremental parsing
+    if orjson is not None and os.fstat(f.fileno()).st_size < FAQ_STREAM_THRESHOLD:
+        return iter(orjson.loads(f.read()))
+    # Large files: stream records so memory stays bounded
+    if ijson is not None:
+        return ijson.items(f, 'item', use_float=True)
+    return iter(json.load(f))
+
 def load_sample_faqs():
     """Load sample FAQ data from JSON file"""
     
     # Path to sample FAQs
-    faq_file = Path(__file__).parent.parent / "data" / "sample_faqs.json"
+    faq_file = _REPO_ROOT / "data" / "sample_faqs.json"
     
     if not faq_file.exists():
         print(f"❌ Sample FAQ file not found: {faq_file}")
         return False
     
     try:
-        with open(faq_file, 'r', encoding='utf-8') as f:
-            faqs_data = json.load(f)
-        
-        # Get database session
-        db_gen = get_db()
-        db = next(db_gen)
-        
-        try:
-            # Check if FAQs already exist
-            existing_count = db.query(FAQ).count()
-            if existing_count > 0:
-                print(f"📝 Database already contains {existing_count} FAQs")
-                response = input("Do you want to clear existing FAQs and reload? (y/N): ").strip().lower()
-                if response == 'y':
-                    db.query(FAQ).delete()
-                    db.commit()
-                    print("🗑️ Cleared existing FAQs")
-                else:
-                    print("✅ Keeping existing FAQs")
-                    return True
-            
-            # Load FAQs
-            loaded_count = 0
-            for faq_data in faqs_data:
-                faq = FAQ(
-                    question=faq_data['question'],
-                    answer=faq_data['answer'],
-                    category=faq_data['category'],
-                    keywords=faq_data.get('keywords'),
-                    priority=faq_data.get('priority', 1)
-                )
-                db.add(faq)
-                loaded_count += 1
-            
-            db.commit()
-            print(f"✅ Successfully loaded {loaded_count} FAQs into the database")
-            return True
-            
-        except Exception as e:
-            db.rollback()
-            print(f"❌ Error loading FAQs: {e}")
-            return False
-        finally:
-            db.close()
+        # Open a session directly; the with block closes it
+        with SessionLocal() as db:
+            try:
+                # Check if FAQs already exist
+                existing_count = db.query(FAQ).count()
+                if existing_count > 0:
+                    print(f"📝 Database already contains {existing_count} FAQs")
+                    response = input("Do you want to clear existing FAQs and reload? (y/N): ").strip().lower()
+                    if response == 'y':
+                        db.execute(FAQ.__table__.delete())
+                        db.commit()
+                        print("🗑️ Cleared existing FAQs")
+                    else:
+                        print("✅ Keeping existing FAQs")
+                        return True
+                
+                if db.get_bind().dialect.name == "sqlite":
+                    for pragma in SQLITE_BULK_LOAD_PRAGMAS:
+                        db.execute(text(pragma))
+                
+                # Stream FAQs from the file and insert them in batches, so memory stays
+                # bounded to one batch regardless of file size; all batches share one
+                # transaction so SQLite commits them together
+                loaded_count = 0
+                with open(faq_file, 'rb') as f:
+                    faq_records = iter_faq_records(f)
+                    while True:
+                        faq_rows = [
+                            {
+                                "question": faq_data['question'],
+                                "answer": faq_data['answer'],
+                                "category": faq_data['category'],
+                                "keywords": faq_data.get('keywords'),
+                                "priority": faq_data.get('priority', 1)
+                            }
+                            for faq_data in islice(faq_records, FAQ_BATCH_SIZE)
+                        ]
+                        if not faq_rows:
+                            break
+                        
+                        db.bulk_insert_mappings(FAQ, faq_rows)
+                        loaded_count += len(faq_rows)
+                
+                db.commit()
+                print(f"✅ Successfully loaded {loaded_count} FAQs into the database")
+                return True
+                
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Error loading FAQs: {e}")
+                return False
             
     except Exception as e:
-        print(f"❌ Error reading FAQ file: {e}")
+        print(f"❌ Error opening database: {e}")
         return False
 
 def verify_setup():
@@ -84,16 +142,16 @@ def verify_setup():
     
     try:
         # Test database connection
-        db_gen = get_db()
-        db = next(db_gen)
-        
-        try:
-            # Check FAQ count
-            faq_count = db.query(FAQ).count()
-            
-            # Check FAQ categories
-            categories = db.query(FAQ.category).distinct().all()
-            category_list = [cat[0] for cat in categories]
+        with SessionLocal() as db:
+            # FAQ count and distinct categories in a single round-trip
+            if db.get_bind().dialect.name == "postgresql":
+                categories = func.string_agg(FAQ.category.distinct(), ",")
+            else:
+                categories = func.group_concat(FAQ.category.distinct())
+            faq_count, category_csv = db.execute(
+                select(func.count(), categories).select_from(FAQ)
+            ).one()
+            category_list = category_csv.split(",") if category_csv else []
             
             print("\\n🔍 Setup Verification:")
             print(f"   📊 Total FAQs: {faq_count}")
@@ -105,9 +163,6 @@ def verify_setup():
             else:
                 print("⚠️ No FAQs found in database")
                 return False
-                
-        finally:
-            db.close()
             
     except Exception as e:
         print(f"❌ Setup verification failed: {e}")
@@ -116,8 +171,8 @@ def verify_setup():
 def create_env_file():
     """Create .env file if it doesn't exist"""
     
-    env_file = Path(__file__).parent.parent / ".env"
-    env_example = Path(__file__).parent.parent / ".env.example"
+    env_file = _REPO_ROOT / ".env"
+    env_example = _REPO_ROOT / ".env.example"
     
     if env_file.exists():
         print("📝 .env file already exists")
@@ -125,18 +180,14 @@ def create_env_file():
     
     if env_example.exists():
         try:
-            # Copy .env.example to .env
-            with open(env_example, 'r') as f:
-                content = f.read()
-            
-            with open(env_file, 'w') as f:
-                f.write(content)
+            # Copy .env.example to .env (done by the OS where it can, no Python-side read/write)
+            shutil.copyfile(env_example, env_file)
             
             print("✅ Created .env file from .env.example")
             print("⚠️ Please update the Gemini API key in .env file before running the bot")
             return True
             
-        except Exception as e:
+        except OSError as e:
             print(f"❌ Error creating .env file: {e}")
             return False
     else:
@@ -152,18 +203,23 @@ def main():
     # Load environment variables
     load_dotenv()
     
+    # Each step's output is buffered and written at once; step 3 is left
+    # unbuffered because it may prompt before clearing existing FAQs
+    
     # Create .env file if needed
-    print("\\n1. Checking environment configuration...")
-    create_env_file()
+    with buffered_output():
+        print("\\n1. Checking environment configuration...")
+        create_env_file()
     
     # Initialize database
-    print("\\n2. Initializing database...")
-    try:
-        init_db()
-        print("✅ Database initialized successfully")
-    except Exception as e:
-        print(f"❌ Database initialization failed: {e}")
-        return False
+    with buffered_output():
+        print("\\n2. Initializing database...")
+        try:
+            init_db()
+            print("✅ Database initialized successfully")
+        except Exception as e:
+            print(f"❌ Database initialization failed: {e}")
+            return False
     
     # Load sample FAQs
     print("\\n3. Loading sample FAQ data...")
@@ -171,21 +227,23 @@ def main():
         print("⚠️ FAQ loading failed, but you can add FAQs later via the API")
     
     # Verify setup
-    print("\\n4. Verifying setup...")
-    success = verify_setup()
-    
-    print("\\n" + "=" * 40)
-    
-    if success:
-        print("🎉 Setup completed successfully!")
-        print("\\nNext steps:")
-        print("1. Update your Gemini API key in the .env file")
-        print("2. Install dependencies: pip install -r requirements.txt")
-        print("3. Run the server: python backend/main.py")
-        print("4. Open http://localhost:8000 in your browser")
-    else:
-        print("❌ Setup completed with errors")
-        print("Please check the error messages above and try again")
+    with buffered_output():
+        print("\\n4. Verifying setup...")
+        success = verify_setup()
+    
+    with buffered_output():
+        print("\\n" + "=" * 40)
+        
+        if success:
+            print("🎉 Setup completed successfully!")
+            print("\\nNext steps:")
+            print("1. Update your Gemini API key in the .env file")
+            print("2. Install dependencies: pip install -r requirements.txt")
+            print("3. Run the server: python backend/main.py")
+            print("4. Open http://localhost:8000 in your browser")
+        else:
+            print("❌ Setup completed with errors")
+            print("Please check the error messages above and try again")
     
     return success
 
@@ -0,0 +1,30 @@
+"""
+pytest setup shared by every test module in the project
+Tests run against a throwaway copy of the sample database, so a test run never
+writes to the tracked data/customer_support.db. Set DATABASE_URL to point the
+tests at another database instead.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+SAMPLE_DATABASE = Path(__file__).parent / "data" / "customer_support.db"
+
+_test_db_dir = None
+
+def pytest_configure(config):
+    global _test_db_dir
+
+    # Set before any test module imports database.py, which reads it once
+    if "DATABASE_URL" not in os.environ:
+        _test_db_dir = tempfile.mkdtemp(prefix="support-bot-tests-")
+        test_db = Path(_test_db_dir) / SAMPLE_DATABASE.name
+        if SAMPLE_DATABASE.exists():
+            shutil.copyfile(SAMPLE_DATABASE, test_db)
+        os.environ["DATABASE_URL"] = f"sqlite:///{test_db}"
+
+def pytest_unconfigure(config):
+    if _test_db_dir is not None:
+        shutil.rmtree(_test_db_dir, ignore_errors=True)
@@ -9,24 +9,41 @@ This script demonstrates the core functionality including:
 - Getting conversation summary
 """
 
-import requests
-import json
-import time
+import asyncio
+import httpx
 from typing import Dict, Any
 
-class BotTester:
+# Upper bound on chat requests the demo keeps in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+
+# Connection pool for the demo client: idle connections kept open for reuse, and a hard cap overall
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+
+def print_header(title: str, width: int = 50):
+    """Print a section header in a single write"""
+    rule = "=" * width
+    print(f"\n{rule}\n{title}\n{rule}")
+
+class AsyncBotTester:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
         self.session_id = None
-        self.session = requests.Session()
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url, http2=True, limits=HTTP_LIMITS, timeout=10
+        )
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    async def close(self):
+        """Close the HTTP client"""
+        await self.client.aclose()
     
-    def start_session(self, name: str = "Demo User", email: str = "demo@example.com") -> bool:
+    async def start_session(self, name: str = "Demo User", email: str = "demo@example.com") -> bool:
         """Start a new chat session"""
         print(f"🚀 Starting new session for {name}...")
         
         try:
-            response = self.session.post(
-                f"{self.base_url}/api/sessions/start",
+            response = await self.client.post(
+                "/api/sessions/start",
                 json={
                     "customer_name": name,
                     "customer_email": email
@@ -46,21 +63,24 @@ class BotTester:
             print(f"❌ Error starting session: {e}")
             return False
     
-    def send_message(self, message: str) -> Dict[str, Any]:
+    async def send_message(self, message: str) -> Dict[str, Any]:
         """Send a message and get bot response"""
         if not self.session_id:
             raise ValueError("No active session. Call start_session() first.")
         
-        print(f"\n👤 User: {message}")
-        
         try:
-            response = self.session.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "session_id": self.session_id,
-                    "message": message
-                }
-            )
+            async with self.semaphore:
+                response = await self.client.post(
+                    "/api/chat",
+                    json={
+                        "session_id": self.session_id,
+                        "message": message
+                    }
+                )
+            
+            # Collect the exchange and print it in one write, so concurrent
+            # messages don't interleave and each exchange costs a single flush
+            lines = [f"\n👤 User: {message}"]
             
             if response.status_code == 200:
                 data = response.json()
@@ -68,31 +88,33 @@ class BotTester:
                 escalated = data.get("escalated", False)
                 matched_faq = data.get("matched_faq")
                 
-                print(f"🤖 Bot: {bot_response}")
+                lines.append(f"🤖 Bot: {bot_response}")
                 
                 if escalated:
-                    print("🚨 Session has been escalated to human agent!")
+                    lines.append("🚨 Session has been escalated to human agent!")
                 
                 if matched_faq:
-                    print(f"📚 Matched FAQ: {matched_faq}")
+                    lines.append(f"📚 Matched FAQ: {matched_faq}")
                 
+                print("\n".join(lines))
                 return data
             else:
-                print(f"❌ Failed to send message: {response.text}")
+                lines.append(f"❌ Failed to send message: {response.text}")
+                print("\n".join(lines))
                 return {"error": response.text}
                 
         except Exception as e:
-            print(f"❌ Error sending message: {e}")
+            print(f"\n👤 User: {message}\n❌ Error sending message: {e}")
             return {"error": str(e)}
     
-    def get_conversation_history(self) -> list:
+    async def get_conversation_history(self) -> list:
         """Get the conversation history"""
         if not self.session_id:
             raise ValueError("No active session")
         
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/sessions/{self.session_id}/history"
+            response = await self.client.get(
+                f"/api/sessions/{self.session_id}/history"
             )
             
             if response.status_code == 200:
@@ -105,14 +127,14 @@ class BotTester:
             print(f"❌ Error getting history: {e}")
             return []
     
-    def get_session_summary(self) -> str:
+    async def get_session_summary(self) -> str:
         """Get AI-generated session summary"""
         if not self.session_id:
             raise ValueError("No active session")
         
         try:
-            response = self.session.get(
-                f"{self.base_url}/api/sessions/{self.session_id}/summary"
+            response = await self.client.get(
+                f"/api/sessions/{self.session_id}/summary"
             )
             
             if response.status_code == 200:
@@ -125,14 +147,14 @@ class BotTester:
             print(f"❌ Error getting summary: {e}")
             return ""
     
-    def end_session(self) -> bool:
+    async def end_session(self) -> bool:
         """End the chat session"""
         if not self.session_id:
             return True
         
         try:
-            response = self.session.post(
-                f"{self.base_url}/api/sessions/{self.session_id}/end"
+            response = await self.client.post(
+                f"/api/sessions/{self.session_id}/end"
             )
             
             if response.status_code == 200:
@@ -146,11 +168,9 @@ class BotTester:
             print(f"❌ Error ending session: {e}")
             return False
 
-def run_faq_test(tester: BotTester):
+async def run_faq_test(tester: AsyncBotTester):
     """Test FAQ matching functionality"""
-    print("\n" + "="*50)
-    print("📚 Testing FAQ Matching")
-    print("="*50)
+    print_header("📚 Testing FAQ Matching")
     
     faq_questions = [
         "How do I reset my password?",
@@ -160,15 +180,12 @@ def run_faq_test(tester: BotTester):
         "What is your refund policy?"
     ]
     
-    for question in faq_questions:
-        response = tester.send_message(question)
-        time.sleep(1)  # Be nice to the API
+    # FAQ probes are independent, so send them concurrently
+    await asyncio.gather(*[tester.send_message(question) for question in faq_questions])
 
-def run_escalation_test(tester: BotTester):
+async def run_escalation_test(tester: AsyncBotTester):
     """Test escalation scenarios"""
-    print("\n" + "="*50)
-    print("🚨 Testing Escalation Scenarios")
-    print("="*50)
+    print_header("🚨 Testing Escalation Scenarios")
     
     escalation_messages = [
         "I want to speak to a manager",
@@ -178,17 +195,14 @@ def run_escalation_test(tester: BotTester):
     ]
     
     for message in escalation_messages:
-        response = tester.send_message(message)
+        response = await tester.send_message(message)
         if response.get("escalated"):
             print("✅ Escalation detected correctly!")
             break
-        time.sleep(1)
 
-def run_conversation_test(tester: BotTester):
+async def run_conversation_test(tester: AsyncBotTester):
     """Test conversational flow"""
-    print("\n" + "="*50)
-    print("💬 Testing Conversation Flow")
-    print("="*50)
+    print_header("💬 Testing Conversation Flow")
     
     conversation = [
         "Hi, I'm having trouble logging into my account",
@@ -198,21 +212,28 @@ def run_conversation_test(tester: BotTester):
         "Thank you for your help!"
     ]
     
+    # Each turn builds on the previous one, so these stay sequential
     for message in conversation:
-        response = tester.send_message(message)
-        time.sleep(1)
+        response = await tester.send_message(message)
 
-def main():
+async def main():
     """Main demo function"""
     print("🤖 AI Customer Support Bot - Demo Test")
     print("=" * 60)
     
     # Initialize tester
-    tester = BotTester()
+    tester = AsyncBotTester()
     
+    try:
+        await run_demo(tester)
+    finally:
+        await tester.close()
+
+async def run_demo(tester: AsyncBotTester):
+    """Run the demo scenarios against a running server"""
     # Check if server is running
     try:
-        response = requests.get(f"{tester.base_url}/health")
+        response = await tester.client.get("/health")
         if response.status_code != 200:
             print("❌ Bot server is not running!")
             print("Please start the server with: python backend/main.py")
@@ -224,34 +245,32 @@ def main():
         return
     
     # Start session
-    if not tester.start_session("Demo User", "demo@example.com"):
+    if not await tester.start_session("Demo User", "demo@example.com"):
         return
     
     # Run different test scenarios
     try:
         # Basic conversation test
-        run_conversation_test(tester)
+        await run_conversation_test(tester)
         
         # FAQ matching test
-        run_faq_test(tester)
+        await run_faq_test(tester)
         
         # Escalation test
-        run_escalation_test(tester)
+        await run_escalation_test(tester)
         
-        # Get conversation history
-        print("\n" + "="*50)
-        print("📋 Conversation History")
-        print("="*50)
+        # History and summary are independent reads, so fetch them together
+        history, summary = await asyncio.gather(
+            tester.get_conversation_history(),
+            tester.get_session_summary()
+        )
         
-        history = tester.get_conversation_history()
+        # Conversation history
+        print_header("📋 Conversation History")
         print(f"Total exchanges: {len(history)}")
         
-        # Get session summary
-        print("\n" + "="*50)
-        print("📊 Session Summary")
-        print("="*50)
-        
-        summary = tester.get_session_summary()
+        # Session summary
+        print_header("📊 Session Summary")
         if summary:
             print(f"AI Summary:\n{summary}")
         else:
@@ -259,11 +278,9 @@ def main():
         
     finally:
         # Always end the session
-        tester.end_session()
+        await tester.end_session()
     
-    print("\n" + "="*60)
-    print("🎉 Demo completed! Check the conversation flow above.")
-    print("="*60)
+    print_header("🎉 Demo completed! Check the conversation flow above.", width=60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -5,38 +5,54 @@ This script provides an easy way to get the bot running
 """
 
 import os
+import re
 import sys
 import subprocess
+from importlib.util import find_spec
 from pathlib import Path
 
+# Matches the GEMINI_API_KEY line of .env and captures its value
+_GEMINI_RE = re.compile(rb'^GEMINI_API_KEY=(?P<v>.*)$', re.M)
+GEMINI_KEY_PLACEHOLDER = b'your_gemini_api_key_here'
+
+MIN_PYTHON = (3, 9)
+_PY_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+
+def _present(root):
+    """Return the names of the entries in a directory (empty if it doesn't exist)"""
+    try:
+        with os.scandir(root) as it:
+            return {entry.name for entry in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
 def check_python_version():
     """Check if Python version is compatible"""
-    if sys.version_info < (3, 8):
-        print("❌ Python 3.8 or higher is required")
-        print(f"Current version: {sys.version}")
-        return False
-    print(f"✅ Python version: {sys.version.split()[0]}")
-    return True
+    return sys.version_info >= MIN_PYTHON
 
 def check_dependencies():
     """Check if required packages are installed"""
-    required_packages = [
-        'fastapi', 'uvicorn', 'sqlalchemy', 'pydantic', 
-        'google.generativeai', 'python-dotenv', 'httpx', 'jinja2'
-    ]
-    
+    # Package name -> importable module name
+    required_packages = {
+        'fastapi': 'fastapi',
+        'uvicorn': 'uvicorn',
+        'sqlalchemy': 'sqlalchemy',
+        'pydantic': 'pydantic',
+        'google.generativeai': 'google.generativeai',
+        'python-dotenv': 'dotenv',
+        'httpx': 'httpx',
+        'jinja2': 'jinja2',
+        'orjson': 'orjson'
+    }
+    
+    # find_spec only locates each module instead of importing (and initializing) it
     missing_packages = []
-    
-    for package in required_packages:
+    for package, module in required_packages.items():
         try:
-            # Handle special cases for package names
-            if package == 'python-dotenv':
-                __import__('dotenv')
-            elif package == 'google.generativeai':
-                __import__('google.generativeai')
-            else:
-                __import__(package.replace('-', '_'))
+            if find_spec(module) is None:
+                missing_packages.append(package)
         except ImportError:
+            # Raised when a parent package (e.g. google) is missing
             missing_packages.append(package)
     
     if missing_packages:
@@ -50,11 +66,13 @@ def check_dependencies():
     print("✅ All required packages are installed")
     return True
 
-def check_env_file():
+def check_env_file(entries=None):
     """Check if .env file exists and has required variables"""
+    if entries is None:
+        entries = _present(".")
     env_file = Path(".env")
     
-    if not env_file.exists():
+    if ".env" not in entries:
         print("❌ .env file not found")
         print("Please create .env file with your configuration")
         print("You can copy from .env.example and update the values")
@@ -62,15 +80,17 @@ def check_env_file():
     
     # Read .env file and check for OpenAI API key
     try:
-        with open(env_file, 'r') as f:
+        with open(env_file, 'rb') as f:
             content = f.read()
         
-        if 'GEMINI_API_KEY=your_gemini_api_key_here' in content:
-            print("⚠️ Please update GEMINI_API_KEY in .env file")
+        # Single pass over the file: find the key and pull out its value
+        match = _GEMINI_RE.search(content)
+        if match is None:
+            print("⚠️ GEMINI_API_KEY not found in .env file")
             return False
         
-        if 'GEMINI_API_KEY=' not in content:
-            print("⚠️ GEMINI_API_KEY not found in .env file")
+        if match['v'].strip() in (b'', GEMINI_KEY_PLACEHOLDER):
+            print("⚠️ Please update GEMINI_API_KEY in .env file")
             return False
         
         print("✅ .env file configured")
@@ -80,30 +100,31 @@ def check_env_file():
         print(f"❌ Error reading .env file: {e}")
         return False
 
-def check_database():
+def check_database(entries=None):
     """Check if database is set up"""
-    data_dir = Path("data")
-    db_file = data_dir / "customer_support.db"
+    if entries is None:
+        entries = _present(".")
     
-    if not data_dir.exists():
+    if "data" not in entries:
         print("⚠️ Data directory not found, will be created during setup")
         return False
     
-    if not db_file.exists():
+    if "customer_support.db" not in _present("data"):
         print("⚠️ Database not found, needs initialization")
         return False
     
     print("✅ Database file exists")
     return True
 
-def run_setup():
+def run_setup(entries=None):
     """Run the setup script"""
     print("\\n🔧 Running setup script...")
+    if entries is None:
+        entries = _present(".")
     
     try:
         # Change to the correct directory
-        backend_path = Path("backend")
-        if backend_path.exists():
+        if "backend" in entries:
             result = subprocess.run([
                 sys.executable, "backend/setup.py"
             ], capture_output=True, text=True)
@@ -125,22 +146,19 @@ def run_setup():
         print(f"❌ Error running setup: {e}")
         return False
 
-def start_server():
+def start_server(entries=None):
     """Start the FastAPI server"""
     print("\\n🚀 Starting the AI Customer Support Bot server...")
+    if entries is None:
+        entries = _present(".")
     
     try:
         # Try different paths to find main.py
-        main_paths = [
-            Path("backend/main.py"),
-            Path("main.py")
-        ]
-        
         main_file = None
-        for path in main_paths:
-            if path.exists():
-                main_file = path
-                break
+        if "backend" in entries and "main.py" in _present("backend"):
+            main_file = Path("backend/main.py")
+        elif "main.py" in entries:
+            main_file = Path("main.py")
         
         if not main_file:
             print("❌ main.py not found")
@@ -174,11 +192,17 @@ def main():
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
     
+    # List the project root once; the checks below test membership in it
+    entries = _present(".")
+    
     print("\\n📋 System Check:")
     
     # Check Python version
     if not check_python_version():
+        print("❌ Python 3.9 or higher is required")
+        print(f"Current version: {_PY_VERSION}")
         return False
+    print(f"✅ Python version: {_PY_VERSION}")
     
     # Check dependencies
     if not check_dependencies():
@@ -187,15 +211,15 @@ def main():
         return False
     
     # Check .env file
-    env_ok = check_env_file()
+    env_ok = check_env_file(entries)
     
     # Check database
-    db_ok = check_database()
+    db_ok = check_database(entries)
     
     # Run setup if needed
     if not db_ok:
         print("\\n🔧 Database setup required...")
-        if not run_setup():
+        if not run_setup(entries):
             return False
     
     if not env_ok:
@@ -207,7 +231,7 @@ def main():
     
     # Start server
     print("\\n✅ All checks passed!")
-    return start_server()
+    return start_server(entries)
 
 if __name__ == "__main__":
     try:
@@ -4,30 +4,53 @@ Start the AI Customer Support Bot and automatically open browser
 """
 
 import os
-import sys
 import time
+import socket
 import subprocess
 import webbrowser
-import threading
+from multiprocessing import Process
 from pathlib import Path
 
-def check_server_ready():
+import start
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_START_TIMEOUT = 30  # seconds
+
+def check_server_ready(timeout=SERVER_START_TIMEOUT):
     """Check if server is ready to accept connections"""
-    import requests
-    for attempt in range(30):  # Wait up to 30 seconds
-        try:
-            response = requests.get("http://localhost:8000/health", timeout=2)
-            if response.status_code == 200:
-                return True
-        except:
-            pass
-        time.sleep(1)
+    import httpx
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        # Cheap TCP probe: fails immediately while nothing is listening yet
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.1)
+            port_open = sock.connect_ex((SERVER_HOST, SERVER_PORT)) == 0
+        
+        if port_open:
+            # The port is bound; confirm the app itself answers
+            try:
+                response = httpx.head(f"http://{SERVER_HOST}:{SERVER_PORT}/health", timeout=2)
+                if response.status_code == 200:
+                    return True
+            except httpx.HTTPError:
+                pass
+        
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.5)
     return False
 
 def open_browser_when_ready():
     """Open browser once server is ready"""
     print("🌐 Waiting for server to start...")
-    if check_server_ready():
+    try:
+        ready = check_server_ready()
+    except KeyboardInterrupt:
+        # Ctrl+C reaches this process too; the server side reports the stop
+        return
+    
+    if ready:
         print("🎉 Server is ready! Opening browser in fullscreen...")
         try:
             # Try to open Chrome in fullscreen mode (app mode)
@@ -76,21 +99,22 @@ def main():
     print("🚀 AI Customer Support Bot - Auto Startup")
     print("=" * 50)
     
-    # Change to script directory
-    script_dir = Path(__file__).parent
+    # Change to script directory (resolved, since start.main() chdirs as well)
+    script_dir = Path(__file__).resolve().parent
     os.chdir(script_dir)
     
     print("\n📋 Starting server and browser...")
     
     try:
         # Start browser opening in background
-        browser_thread = threading.Thread(target=open_browser_when_ready)
-        browser_thread.daemon = True
-        browser_thread.start()
+        # The readiness poll runs in its own process so it doesn't compete with
+        # the server for this interpreter; daemon=True ends it with the server
+        browser_process = Process(target=open_browser_when_ready, daemon=True)
+        browser_process.start()
         
-        # Start the main server
+        # Run the start.py checks and server in this interpreter
         print("🖥️ Starting FastAPI server...")
-        subprocess.run([sys.executable, "start.py"])
+        start.main()
         
     except KeyboardInterrupt:
         print("\n\n👋 Server stopped by user")
@@ -12,9 +12,8 @@ backend_path = Path(__file__).parent / "backend"
 sys.path.insert(0, str(backend_path))
 
 try:
-    from llm_service import LLMService
-    from database import init_db, SessionLocal
-    from bot_service import BotService
+    # Backend modules (and with them the Gemini SDK) are imported inside the
+    # tests, so the environment checks in main() don't pay for them
     from dotenv import load_dotenv
     
     load_dotenv()
@@ -23,6 +22,8 @@ try:
         """Test the LLM service directly"""
         print("🧪 Testing LLM Service...")
         try:
+            from llm_service import LLMService
+            
             llm = LLMService()
             response, should_escalate, faq_id = llm.generate_response(
                 "Hello, I need help with my account password", [], []
@@ -38,6 +39,9 @@ try:
         """Test the bot service with database"""
         print("\n🤖 Testing Bot Service...")
         try:
+            from database import init_db, SessionLocal
+            from bot_service import BotService
+            
             # Initialize database
             init_db()
             db = SessionLocal()
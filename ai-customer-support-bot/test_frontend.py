@@ -3,31 +3,61 @@
 Quick test to verify frontend is being served correctly
 """
 
-import requests
+import httpx
+import socket
 import time
 import subprocess
 import sys
 from pathlib import Path
 
+SERVER_ADDRESS = ("localhost", 8000)
+BASE_URL = f"http://{SERVER_ADDRESS[0]}:{SERVER_ADDRESS[1]}"
+
+def server_listening(timeout=0.5):
+    """Fast check that something accepts connections on the server port"""
+    try:
+        with socket.create_connection(SERVER_ADDRESS, timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def create_client():
+    """Create an HTTP client that reuses one keep-alive connection for all checks"""
+    return httpx.Client(
+        base_url=BASE_URL,
+        timeout=2.0,
+        # A custom transport overrides the client's own http2 flag, so it is set here
+        transport=httpx.HTTPTransport(http2=True, retries=1),
+    )
+
 def test_frontend_serving():
     """Test if the frontend is being served at localhost:8000"""
+    print("🧪 Testing frontend serving...")
+    
+    # Fail fast instead of waiting out request timeouts when nothing is listening
+    if not server_listening():
+        print("❌ Cannot connect to server at localhost:8000")
+        print("   Make sure the server is running with: python start.py")
+        return False
+    
+    client = create_client()
     try:
-        print("🧪 Testing frontend serving...")
+        # Test the main page; it is a few KB, so the whole body is checked
+        response = client.get("/", timeout=5)
+        status_code = response.status_code
         
-        # Test the main page
-        response = requests.get("http://localhost:8000", timeout=5)
-        if response.status_code == 200:
+        if status_code == 200:
             if "AI Customer Support" in response.text and "script src" in response.text:
                 print("✅ Frontend HTML is being served correctly")
                 
-                # Test static files
-                css_response = requests.get("http://localhost:8000/static/style.css", timeout=5)
+                # Test static files; HEAD checks them without downloading the bodies
+                css_response = client.head("/static/style.css", timeout=1)
                 if css_response.status_code == 200:
                     print("✅ CSS file is accessible")
                 else:
                     print("⚠️ CSS file not accessible")
                 
-                js_response = requests.get("http://localhost:8000/static/script.js", timeout=5)
+                js_response = client.head("/static/script.js", timeout=1)
                 if js_response.status_code == 200:
                     print("✅ JavaScript file is accessible")
                 else:
@@ -38,16 +68,18 @@ def test_frontend_serving():
                 print("❌ Frontend content not found in response")
                 return False
         else:
-            print(f"❌ Server returned status code: {response.status_code}")
+            print(f"❌ Server returned status code: {status_code}")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Cannot connect to server at localhost:8000")
         print("   Make sure the server is running with: python start.py")
         return False
     except Exception as e:
         print(f"❌ Error testing frontend: {e}")
         return False
+    finally:
+        client.close()
 
 def main():
     print("🚀 AI Customer Support Bot - Frontend Test")
@@ -0,0 +1,71 @@
+"""
+Shared pytest fixtures for the bot tests
+The backend is put on sys.path once here. The database connection and mock LLM
+are created once per test session; each test gets a session and BotService on
+that connection whose changes are rolled back when the test ends
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+backend_path = Path(__file__).parent.parent / "backend"
+if str(backend_path) not in sys.path:
+    sys.path.append(str(backend_path))
+
+@pytest.fixture(scope="session")
+def db_connection():
+    """One database connection held for the whole test session"""
+    from sqlalchemy import event
+    from database import init_db, engine
+    
+    init_db()
+    connection = engine.connect()
+    driver_connection = connection.connection.driver_connection
+    if engine.dialect.name == "sqlite":
+        # pysqlite starts and ends transactions on its own, which breaks SAVEPOINTs;
+        # switch that off and let SQLAlchemy emit BEGIN itself
+        driver_connection.isolation_level = None
+        event.listen(connection, "begin", lambda conn: conn.exec_driver_sql("BEGIN"))
+    try:
+        yield connection
+    finally:
+        if engine.dialect.name == "sqlite":
+            driver_connection.isolation_level = ""
+        connection.close()
+
+@pytest.fixture
+def db_session(db_connection):
+    """
+    Session for one test, rolled back afterwards
+    The test runs inside an outer transaction on the shared connection; commits
+    made by the code under test only release savepoints, so nothing is kept
+    """
+    from sqlalchemy.orm import Session
+    
+    transaction = db_connection.begin()
+    db = Session(bind=db_connection, join_transaction_mode="create_savepoint")
+    try:
+        yield db
+    finally:
+        db.close()
+        transaction.rollback()
+
+@pytest.fixture(scope="session")
+def mock_llm():
+    """Mock LLM so the tests never call the Gemini API"""
+    from test_bot import MockLLMService
+    
+    return MockLLMService()
+
+@pytest.fixture
+def bot_service(db_session, mock_llm):
+    """BotService backed by the shared session and the mock LLM"""
+    from bot_service import BotService
+    
+    service = BotService(db_session)
+    service.llm_service = mock_llm
+    # FAQs don't change during a run, so load them once for every test
+    service.prefetch_faqs()
+    return service